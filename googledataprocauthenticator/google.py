@@ -16,18 +16,21 @@
 """Google Cloud Dataproc Authenticator for Sparkmagic"""
 
 
+import datetime
 import json
 import os
 import subprocess
 import re
 import random
-import urllib3.util
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from hdijupyterutils.ipythondisplay import IpythonDisplay
 import ipyvuetify as v
-from google.cloud import dataproc_v1beta2
-import google.auth.transport.requests
+import google.auth
 from google.auth import _cloud_sdk
-from google.auth.exceptions import UserAccessTokenError
+from google.auth.exceptions import DefaultCredentialsError, UserAccessTokenError
 from google.oauth2.credentials import Credentials
 from sparkmagic.auth.customauth import Authenticator
 from sparkmagic.livyclientlib.exceptions import BadUserConfigurationException
@@ -37,8 +40,235 @@ import googledataprocauthenticator.utils.constants as constants
 
 ipython_display = IpythonDisplay()
 
+# GoogleAuth attributes that are created by GoogleAuth.get_widgets
+_WIDGET_ATTRIBUTES = frozenset(['widgets', 'account_widget', 'project_widget', 'region_widget',
+                                'filter_widget', 'cluster_widget'])
+
+_GCLOUD = constants.CLOUD_SDK_WINDOWS_COMMAND if os.name == "nt" else \
+    constants.CLOUD_SDK_POSIX_COMMAND
+# The absolute path of the gcloud executable, looked up on PATH on first use
+_gcloud_path = None
+# The ``gcloud auth list`` command, built once _gcloud_path is resolved
+_list_accounts_command_tuple = None
+# Keeps gcloud.cmd from opening a console window on Windows
+_GCLOUD_CREATIONFLAGS = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+# Maps a gcloud command to a (timestamp, parsed output) tuple
+_gcloud_output_cache = dict()
+# Maps an account to a (timestamp, bool) tuple recording whether gcloud could print an access
+# token for it. The token itself is not cached.
+_access_token_probe_cache = dict()
+# Maps an (account, scopes) pair to a (timestamp, (credentials, project)) tuple
+_account_credentials_cache = dict()
+_gcloud_cache_lock = threading.Lock()
+# Maps a region to the (credentials, dataproc_v1beta2.ClusterControllerClient) last used for it
+_cluster_client_cache = dict()
+_cluster_client_cache_lock = threading.Lock()
+# The (time.monotonic() timestamp, scopes, result) of the last google.auth.default call, where
+# result is either the (credentials, project) tuple it returned or the error it raised
+_default_credentials_cache = None
+# Where output of gcloud commands that contain no secrets is stored between notebook sessions
+_gcloud_cache_path = os.path.join(os.path.expanduser('~'), '.config', 'dataprocmagic',
+                                  'gcloud_cache.json')
+
+def _load_persisted_gcloud_output(command):
+    """Returns the (timestamp, output) tuple stored on disk for command, or None."""
+    try:
+        with open(_gcloud_cache_path) as cache_file:
+            timestamp, output = json.load(cache_file)[' '.join(command)]
+        return timestamp, output
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _persist_gcloud_output(command, timestamp, output):
+    """Stores the output of command on disk. Failing to write the cache is not an error."""
+    try:
+        os.makedirs(os.path.dirname(_gcloud_cache_path), exist_ok=True)
+        with open(_gcloud_cache_path, 'w') as cache_file:
+            json.dump({' '.join(command): [timestamp, output]}, cache_file)
+    except OSError:
+        pass
+
+def _is_fresh(timestamp):
+    """Returns whether a cache entry created at timestamp can still be used. An entry expires
+    after ``constants.GCLOUD_CACHE_TTL_SECONDS`` or once gcloud's credential store changes, e.g.
+    after ``gcloud auth login`` or ``gcloud auth revoke``."""
+    if time.time() - timestamp >= constants.GCLOUD_CACHE_TTL_SECONDS:
+        return False
+    # access_tokens.db is not checked since gcloud rewrites it whenever it prints a token
+    try:
+        return os.path.getmtime(os.path.join(_cloud_sdk.get_config_path(),
+                                             'credentials.db')) < timestamp
+    except OSError:
+        return True
+
+def _get_gcloud_path():
+    """Returns the absolute path of the gcloud executable so that invoking it does not search
+    PATH every time.
+
+    Raises:
+        sparkmagic.livyclientlib.BadUserConfigurationException: if gcloud is not on PATH
+    """
+    global _gcloud_path, _list_accounts_command_tuple
+    if _gcloud_path is None:
+        # a failed lookup is not cached so that gcloud can be installed without a restart
+        gcloud_path = shutil.which(_GCLOUD)
+        if gcloud_path is None:
+            raise BadUserConfigurationException(f"Gcloud cannot be invoked. {_GCLOUD} was not "\
+                "found on PATH.")
+        _list_accounts_command_tuple = (gcloud_path,) + \
+            constants.CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND
+        _gcloud_path = gcloud_path
+    return _gcloud_path
+
+def _list_accounts_command():
+    """Returns the ``gcloud auth list`` command"""
+    _get_gcloud_path()
+    return _list_accounts_command_tuple
+
+def _describe_account_command(account):
+    """Returns the ``gcloud auth describe ACCOUNT`` command"""
+    return (_get_gcloud_path(), "auth", "describe", account, '--format', 'json')
+
+def _get_project_command(account):
+    """Returns the ``gcloud config get-value project --account=ACCOUNT`` command"""
+    return (_get_gcloud_path(), "config", "get-value", 'project', '--account', account,
+            '--format', 'json')
+
+def _parse_account_list(output):
+    """Parses ``gcloud auth list --format value(account,status)`` output into account objects.
+
+    Args:
+        output (bytes): lines of tab separated account and status values
+
+    Returns:
+        Sequence[dict]: each value is a dict with account and status keys
+    """
+    if isinstance(output, bytes):
+        output = output.decode("utf-8")
+    account_objects = list()
+    for line in output.splitlines():
+        account, _, status = line.partition('\t')
+        if account:
+            account_objects.append({'account': account, 'status': status.strip()})
+    return account_objects
+
+def _run_gcloud(command, persist=False, parse=json.loads):
+    """Runs a gcloud command and returns its parsed output. Output that is less than
+    ``constants.GCLOUD_CACHE_TTL_SECONDS`` old is reused instead of invoking gcloud again, unless
+    gcloud's credential store changed after it was cached.
+
+    Args:
+        command (Tuple[str]): the gcloud command to run, including the gcloud executable
+        persist (bool): if True the output is also stored on disk so that it can be reused after
+            a notebook restart. Only pass True for commands whose output contains no secrets.
+        parse (Callable[[bytes], Any]): parses the output of the command. The parsed output
+            must be json serializable if persist is True.
+
+    Returns:
+        Any: the parsed output of the command
+
+    Raises:
+        subprocess.CalledProcessError: if the command exits with a non-zero status
+        OSError: if gcloud cannot be invoked
+        ValueError: if the output of the command cannot be parsed
+    """
+    now = time.time()
+    with _gcloud_cache_lock:
+        cached = _gcloud_output_cache.get(command)
+        if cached is None and persist:
+            cached = _load_persisted_gcloud_output(command)
+            if cached is not None:
+                # later calls are served from memory instead of re-reading the file
+                _gcloud_output_cache[command] = cached
+        if cached is not None and _is_fresh(cached[0]):
+            return cached[1]
+    # stderr is kept out of the output since gcloud writes warnings there that are not json
+    output = parse(subprocess.check_output(command, stderr=subprocess.PIPE, shell=False,
+                                           close_fds=True, creationflags=_GCLOUD_CREATIONFLAGS))
+    with _gcloud_cache_lock:
+        _gcloud_output_cache[command] = (now, output)
+        if persist:
+            _persist_gcloud_output(command, now, output)
+    return output
+
+def _clear_gcloud_cache(account=None):
+    """Drops cached gcloud output and credentials. If account is given, only the entries for
+    that account are dropped."""
+    with _gcloud_cache_lock:
+        if account is None:
+            _gcloud_output_cache.clear()
+            _access_token_probe_cache.clear()
+            _account_credentials_cache.clear()
+            try:
+                os.remove(_gcloud_cache_path)
+            except OSError:
+                pass
+            return
+        for command in [command for command in _gcloud_output_cache if account in command]:
+            del _gcloud_output_cache[command]
+        _access_token_probe_cache.pop(account, None)
+        for key in [key for key in _account_credentials_cache if key[0] == account]:
+            del _account_credentials_cache[key]
+
+def _record_access_token_probe(account, has_access_token):
+    """Caches whether an access token could be obtained for account"""
+    with _gcloud_cache_lock:
+        _access_token_probe_cache[account] = (time.time(), has_access_token)
+
+def _has_access_token(account):
+    """Checks whether ``gcloud auth print-access-token --account=ACCOUNT`` succeeds, reusing a
+    result that is less than ``constants.GCLOUD_CACHE_TTL_SECONDS`` old and newer than gcloud's
+    credential store.
+
+    Args:
+        account (str): the account to check
+
+    Returns:
+        bool: whether an access token could be obtained for the account
+    """
+    with _gcloud_cache_lock:
+        cached = _access_token_probe_cache.get(account)
+    if cached is not None and _is_fresh(cached[0]):
+        return cached[1]
+    try:
+        _cloud_sdk.get_auth_access_token(account)
+    except UserAccessTokenError:
+        _clear_gcloud_cache(account)
+        _record_access_token_probe(account, False)
+        return False
+    _record_access_token_probe(account, True)
+    return True
+
+def _probe_credentialed_account(account):
+    """Checks whether an access token can be obtained for an account listed by
+    ``gcloud auth list``.
+
+    Args:
+        account (dict): an account object with account and status keys
+
+    Returns:
+        Tuple[str, bool, bool]: the account name, whether an access token could be obtained for
+        it, and whether it is the active account
+    """
+    try:
+        # if the account does not have an access token we don't add it to the account
+        # dropdown
+        if not _has_access_token(account['account']):
+            return None, False, False
+        # service accounts will be added later with 'default-credentials'
+        get_credentials_for_account(account['account'])
+        return account['account'], True, account['status'] == 'ACTIVE'
+    # when the account's credentials cannot be loaded we don't add it to the
+    # credentialed_accounts list that populates account dropdown widget.
+    # get_credentials_for_account has already dropped the account's cached entries, so the next
+    # listing checks it again.
+    except Exception:
+        pass
+    return None, False, False
+
 def list_credentialed_user_accounts():
-    """Load all of user's credentialed accounts with ``gcloud auth list`` command.
+    """Load all of user's credentialed accounts with ``gcloud auth list`` command. The accounts
+    are probed for access tokens concurrently since each probe invokes gcloud.
 
     Returns:
         Sequence[str]: each value is a str of one of the users credentialed accounts
@@ -46,41 +276,31 @@ def list_credentialed_user_accounts():
     Raises:
         sparkmagic.livyclientlib.BadUserConfigurationException: if gcloud cannot be invoked
     """
-    accounts_json = ""
-    if os.name == "nt":
-        command = constants.CLOUD_SDK_WINDOWS_COMMAND
-    else:
-        command = constants.CLOUD_SDK_POSIX_COMMAND
     try:
-        command = (command,) + constants.CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND
         # run `gcloud auth list` command
-        accounts_json = subprocess.check_output(command, stderr=subprocess.STDOUT)
-        account_objects = json.loads(accounts_json)
-        credentialed_accounts = list()
-        active_account = None
-        #convert account dictionaries with status and account keys to a list of accounts
-        for account in account_objects:
-            try:
-                # if the account does not have an access token we don't add it to the account
-                # dropdown
-                _cloud_sdk.get_auth_access_token(account['account'])
-                # service accounts will be added later with 'default-credentials'
-                get_credentials_for_account(account['account'])
-                if account['status'] == 'ACTIVE':
-                    active_account = account['account']
-                credentialed_accounts.append(account['account'])
-            # when`gcloud auth print-access-token --account=account` fails we don't add it to
-            # credentialed_accounts list that populates account dropdown widget
-            except:
-                pass
-        return credentialed_accounts, active_account
-    except Exception as caught_exc:
+        account_objects = _run_gcloud(_list_accounts_command(), persist=True,
+                                      parse=_parse_account_list)
+    except (subprocess.CalledProcessError, OSError, ValueError) as caught_exc:
         new_exc = BadUserConfigurationException("Gcloud cannot be invoked.")
         raise new_exc from caught_exc
+    credentialed_accounts = list()
+    active_account = None
+    max_workers = max(1, min(constants.MAX_ACCOUNT_PROBE_WORKERS, len(account_objects)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # map keeps the accounts in the order gcloud listed them
+        for name, has_access_token, is_active in executor.map(_probe_credentialed_account,
+                                                               account_objects):
+            if has_access_token:
+                credentialed_accounts.append(name)
+                if is_active:
+                    active_account = name
+    return credentialed_accounts, active_account
 
 def get_project_id(account):
     """Gets the the Cloud SDK project ID property value using the
-    ``gcloud config get-value project --account=ACCOUNT`` command.
+    ``gcloud config get-value project --account=ACCOUNT`` command. The output is cached with the
+    rest of the gcloud output, so looking up the project of an account that was already listed
+    does not invoke gcloud again.
 
     Args:
         account (str): The account to get the project ID for
@@ -88,22 +308,35 @@ def get_project_id(account):
     Returns:
         Optional[str]: The project ID.
     """
-    if os.name == "nt":
-        command = constants.CLOUD_SDK_WINDOWS_COMMAND
-    else:
-        command = constants.CLOUD_SDK_POSIX_COMMAND
-
     try:
-        config_get_project_command = ("config", "get-value", 'project', '--account', account)
-        output = subprocess.check_output(
-            (command,) + config_get_project_command, stderr=subprocess.STDOUT
-        )
-        return output.decode("utf-8").rstrip()
+        return _run_gcloud(_get_project_command(account)) or None
     except Exception:
         return None
 
+def _read_adc_file(account, scopes_list=None):
+    """Loads an account's credentials from the adc.json file gcloud keeps for it in its
+    legacy_credentials directory, which avoids invoking ``gcloud auth describe ACCOUNT``.
+
+    Args:
+        account (str): user credentialed account to return credentials for
+        scopes_list (Sequence[str]): list of scopes to include in the credentials.
+
+    Returns:
+        google.oauth2.credentials.Credentials: The constructed credentials
+
+    Raises:
+        FileNotFoundError: If gcloud did not store an adc.json file for the account.
+        ValueError: If the adc.json file is not in the expected format.
+    """
+    adc_path = os.path.join(_cloud_sdk.get_config_path(), 'legacy_credentials', account,
+                            'adc.json')
+    with open(adc_path) as adc_file:
+        account_info = json.load(adc_file)
+    return Credentials.from_authorized_user_info(account_info, scopes=scopes_list)
+
 def get_credentials_for_account(account, scopes_list=None):
-    """Load all of user's credentialed accounts with ``gcloud auth describe ACCOUNT`` command.
+    """Load the credentials of one of the user's credentialed accounts from gcloud's
+    legacy_credentials directory, falling back to the ``gcloud auth describe ACCOUNT`` command.
 
     Args:
         account (str): user credentialed account to return credentials for
@@ -118,24 +351,60 @@ def get_credentials_for_account(account, scopes_list=None):
         google.auth.exceptions.UserAccessTokenError: if credentials could not be found for the
             given account.
     """
-    if os.name == "nt":
-        command = constants.CLOUD_SDK_WINDOWS_COMMAND
-    else:
-        command = constants.CLOUD_SDK_POSIX_COMMAND
+    cache_key = (account, tuple(scopes_list) if scopes_list is not None else None)
+    with _gcloud_cache_lock:
+        cached = _account_credentials_cache.get(cache_key)
+    if cached is not None and _is_fresh(cached[0]):
+        return cached[1]
     try:
-        describe_account_command = ("auth", "describe", account, '--format', 'json')
-        command = (command,) + describe_account_command
-        account_json = subprocess.check_output(command, stderr=subprocess.STDOUT)
-        account_describe = json.loads(account_json)
-        credentials = Credentials.from_authorized_user_info(account_describe, scopes=scopes_list)
+        try:
+            credentials = _read_adc_file(account, scopes_list)
+        except FileNotFoundError:
+            account_describe = _run_gcloud(_describe_account_command(account))
+            credentials = Credentials.from_authorized_user_info(account_describe,
+                                                                scopes=scopes_list)
         # if quota_project_id is None, we try to get infer a project from that accounts gcloud
         # configuration
         if credentials.quota_project_id is None:
             credentials = credentials.with_quota_project(get_project_id(account))
-        return (credentials, credentials.quota_project_id)
     except Exception as caught_exc:
+        _clear_gcloud_cache(account)
         new_exc = UserAccessTokenError(f"Could not obtain access token for {account}")
         raise new_exc from caught_exc
+    with _gcloud_cache_lock:
+        _account_credentials_cache[cache_key] = (time.time(), (credentials,
+                                                               credentials.quota_project_id))
+    return (credentials, credentials.quota_project_id)
+
+def _get_cluster_client(region, credentials):
+    """Returns a ClusterControllerClient for region that attaches credentials to its requests.
+    The client is reused while it is requested with the same credentials object, since creating
+    one sets up a new gRPC channel. Only the most recent client of each region is kept so that
+    replaced credentials are not kept alive by the cache.
+
+    Args:
+        region (str): The region of the dataproc api endpoint to use
+        credentials (google.oauth2.credentials.Credentials): The authorization credentials to
+        attach to requests.
+
+    Returns:
+        dataproc_v1beta2.ClusterControllerClient: the client
+    """
+    # imported here since the dataproc client library takes long to import and is only needed
+    # once the user selects a cluster
+    from google.cloud import dataproc_v1beta2
+    with _cluster_client_cache_lock:
+        cached = _cluster_client_cache.get(region)
+        if cached is not None and cached[0] is credentials:
+            return cached[1]
+        client = dataproc_v1beta2.ClusterControllerClient(
+            credentials=credentials,
+            client_options={
+                "api_endpoint": constants.DATAPROC_API_ENDPOINT.format(region=region)
+            }
+            )
+        _cluster_client_cache[region] = (credentials, client)
+        return client
 
 def get_component_gateway_url(project_id, region, cluster_name, credentials):
     """Gets the component gateway url for a cluster name, project id, and region
@@ -156,27 +425,32 @@ def get_component_gateway_url(project_id, region, cluster_name, credentials):
         retry attempts failed.
         ValueError: If the parameters are invalid.
     """
+    from google.api_core import retry
+    from google.api_core.exceptions import Unauthenticated
+    client = _get_cluster_client(region, credentials)
+    #if they do not enter a cluster name, we get a random one for them.
+    if cluster_name is None:
+        cluster_pool, _ = get_cluster_pool(project_id, region, client)
+        cluster_name = random.choice(cluster_pool)
+    # a short retry deadline reports a wrong project, region or cluster name to the user quickly
+    # instead of after the library's default backoff
+    get_cluster_retry = retry.Retry(initial=0.2, maximum=1.0,
+                                    deadline=constants.GET_CLUSTER_RETRY_DEADLINE_SECONDS)
     try:
-        client = dataproc_v1beta2.ClusterControllerClient(
-            credentials=credentials,
-            client_options={
-                "api_endpoint": f"{region}-dataproc.googleapis.com:443"
-            }
-            )
-    except:
-        raise
-    try:
-        #if they do not enter a cluster name, we get a random one for them.
-        if cluster_name is None:
-            cluster_pool, _ = get_cluster_pool(project_id, region, client)
-            cluster_name = random.choice(cluster_pool)
-        response = client.get_cluster(project_id=project_id, region=region, cluster_name=cluster_name)
-        url = response.config.endpoint_config.http_ports.popitem()[1]
-        parsed_uri = urllib3.util.parse_url(url)
-        endpoint_address = f"{parsed_uri.scheme}://{parsed_uri.netloc}/gateway/default/livy/v1"
-        return endpoint_address, cluster_name
-    except:
+        response = client.get_cluster(project_id=project_id, region=region,
+                                      cluster_name=cluster_name, retry=get_cluster_retry,
+                                      timeout=constants.GET_CLUSTER_TIMEOUT_SECONDS)
+    except Unauthenticated:
+        with _cluster_client_cache_lock:
+            _cluster_client_cache.pop(region, None)
         raise
+    url = response.config.endpoint_config.http_ports.popitem()[1]
+    if not url.startswith('http'):
+        raise ValueError(f"Unexpected component gateway url {url}")
+    # url is of the form scheme://netloc/path
+    scheme, _, netloc = url.split('/', 3)[:3]
+    endpoint_address = f"{scheme}//{netloc}/gateway/default/livy/v1"
+    return endpoint_address, cluster_name
 
 def get_cluster_pool(project_id, region, client, selected_filters=None):
     """Gets the clusters for a project, region, and filters
@@ -204,23 +478,20 @@ def get_cluster_pool(project_id, region, client, selected_filters=None):
     if selected_filters is not None:
         filters.extend(selected_filters)
     filter_str = ' AND '.join(filters)
-    try:
-        for cluster in client.list_clusters(request={'project_id' : project_id, 'region' : region, 'filter': filter_str}):
-            #check component gateway is enabled
-            if len(cluster.config.endpoint_config.http_ports.values()) != 0:
-                action_list = list()
-                for action in cluster.config.initialization_actions:
-                    # check if livy init action with a region with the regex pattern [a-z0-9-]+
-                    is_livy_action = re.search("gs://goog-dataproc-initialization-actions-"\
-                    "[a-z0-9-]+/livy/livy.sh", action.executable_file) is not None
-                    if is_livy_action:
-                        action_list.append(action.executable_file)
-                        cluster_pool.append(cluster.cluster_name)
-                        for key, value in cluster.labels.items():
-                            filter_set.add('labels.' + key + '=' + value)
-        return cluster_pool, list(filter_set)
-    except:
-        raise
+    for cluster in client.list_clusters(request={'project_id' : project_id, 'region' : region, 'filter': filter_str}):
+        #check component gateway is enabled
+        if len(cluster.config.endpoint_config.http_ports.values()) != 0:
+            action_list = list()
+            for action in cluster.config.initialization_actions:
+                # check if livy init action with a region with the regex pattern [a-z0-9-]+
+                is_livy_action = re.search("gs://goog-dataproc-initialization-actions-"\
+                "[a-z0-9-]+/livy/livy.sh", action.executable_file) is not None
+                if is_livy_action:
+                    action_list.append(action.executable_file)
+                    cluster_pool.append(cluster.cluster_name)
+                    for key, value in cluster.labels.items():
+                        filter_set.add('labels.' + key + '=' + value)
+    return cluster_pool, list(filter_set)
 
 def get_regions():
     """Returns a static list of regions for the region combobox"""
@@ -231,12 +502,48 @@ def get_regions():
     'us-east2', 'us-east4', 'us-west1', 'us-west2', 'us-west3', 'us-west4']
     return regions
 
+def _default_credentials(scopes):
+    """Returns the result of ``google.auth.default(scopes=scopes)``, reusing the result of a call
+    with the same scopes made less than ``constants.DEFAULT_CREDENTIALS_CACHE_TTL_SECONDS`` ago.
+    Failures are reused too since finding out that application-default credentials are not
+    configured can involve probing the metadata server.
+
+    Args:
+        scopes (Sequence[str]): list of scopes to include in the credentials.
+
+    Returns:
+        Tuple[google.auth.credentials.Credentials, Optional[str]]: the credentials and project
+
+    Raises:
+        google.auth.exceptions.DefaultCredentialsError: if application-default credentials are
+            not configured.
+    """
+    global _default_credentials_cache
+    cached = _default_credentials_cache
+    if cached is not None and cached[1] == tuple(scopes) and \
+    time.monotonic() - cached[0] < constants.DEFAULT_CREDENTIALS_CACHE_TTL_SECONDS:
+        result = cached[2]
+    else:
+        try:
+            result = google.auth.default(scopes=scopes)
+        except DefaultCredentialsError as caught_exc:
+            result = caught_exc
+        _default_credentials_cache = (time.monotonic(), tuple(scopes), result)
+    if isinstance(result, DefaultCredentialsError):
+        raise DefaultCredentialsError(*result.args) from result
+    return result
+
+def _clear_default_credentials_cache():
+    """Drops the cached result of google.auth.default"""
+    global _default_credentials_cache
+    _default_credentials_cache = None
+
 def application_default_credentials_configured():
     """Checks if google application-default credentials are configured"""
     try:
-        credentials, _ = google.auth.default(scopes=['https://www.googleapis.com/auth/' \
+        credentials, _ = _default_credentials(['https://www.googleapis.com/auth/' \
         'cloud-platform', 'https://www.googleapis.com/auth/userinfo.email'])
-    except:
+    except DefaultCredentialsError:
         return False
     return credentials is not None
 
@@ -245,23 +552,71 @@ class GoogleAuth(Authenticator):
     """Custom Authenticator to use Google OAuth with SparkMagic."""
 
     def __init__(self, parsed_attributes=None):
-        self.callable_request = google.auth.transport.requests.Request()
+        # created on the first token refresh, see _refresh_cached_token
+        self.callable_request = None
         self.scopes = ['https://www.googleapis.com/auth/cloud-platform',
                        'https://www.googleapis.com/auth/userinfo.email']
-        self.credentialed_accounts, active_user_account = list_credentialed_user_accounts()
-        self.default_credentials_configured = application_default_credentials_configured()
-        if self.default_credentials_configured:
-            self.credentialed_accounts.append('default-credentials')
-        self.active_credentials = None
+        self.parsed_attributes = parsed_attributes
+        self._initialized = False
+        # account discovery can be triggered by concurrent requests and the prefetch timer
+        self._initialize_lock = threading.Lock()
+        self._token_lock = threading.Lock()
+        # the Authorization header value for the cached token
+        self._auth_header = None
+        self._cached_token_expiry = 0
+        self._cached_token_credentials = None
+        # computed on the first call to __hash__ and reset whenever active_credentials or url
+        # change
+        self._hash = None
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_timer = None
+        # Maps a (project, region, cluster name, credentials) tuple to the future of its
+        # get_component_gateway_url call
+        self._gateway_url_futures = dict()
+        # Authenticator.__init__ is not called since it creates the widgets right away, which
+        # requires listing the credentialed accounts. The widgets are created on first access
+        # instead, see __getattr__.
         if parsed_attributes is not None:
-            if parsed_attributes.account in self.credentialed_accounts:
-                self.active_credentials = parsed_attributes.account
-                if self.active_credentials == 'default-credentials' and \
-                self.default_credentials_configured:
-                    self.credentials, self.project = google.auth.default(scopes=self.scopes)
+            self.url = parsed_attributes.url
+            # the user explicitly requested an account, so it is validated right away
+            self._ensure_initialized()
+        else:
+            self.url = "http://example.com/livy"
+
+    def __getattr__(self, name):
+        # only called when name is not an instance attribute, i.e. the widgets were not created yet
+        if name in _WIDGET_ATTRIBUTES:
+            self.widgets = self.get_widgets(constants.WIDGET_WIDTH)
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _ensure_initialized(self):
+        """Lists the user's credentialed accounts and initializes self.credentials the first time
+        account information is needed, since doing so invokes gcloud."""
+        if self._initialized:
+            return
+        with self._initialize_lock:
+            if not self._initialized:
+                self._initialize()
+
+    def _initialize(self):
+        """Lists the user's credentialed accounts and initializes self.credentials. Must be
+        called with self._initialize_lock held."""
+        parsed_attributes = self.parsed_attributes
+        credentialed_accounts, active_user_account = list_credentialed_user_accounts()
+        default_credentials_configured = application_default_credentials_configured()
+        if default_credentials_configured:
+            credentialed_accounts.append('default-credentials')
+        active_credentials = None
+        if parsed_attributes is not None:
+            if parsed_attributes.account in credentialed_accounts:
+                active_credentials = parsed_attributes.account
+                if active_credentials == 'default-credentials' and \
+                default_credentials_configured:
+                    credentials, project = _default_credentials(self.scopes)
                 else:
-                    self.credentials, self.project = get_credentials_for_account(
-                        self.active_credentials, self.scopes
+                    credentials, project = get_credentials_for_account(
+                        active_credentials, self.scopes
                     )
             else:
                 new_exc = BadUserConfigurationException(
@@ -273,18 +628,73 @@ class GoogleAuth(Authenticator):
                 "accounts.")
                 raise new_exc
         else:
-            if self.default_credentials_configured:
-                self.credentials, self.project = google.auth.default(scopes=self.scopes)
-                self.active_credentials = 'default-credentials'
+            if default_credentials_configured:
+                credentials, project = _default_credentials(self.scopes)
+                active_credentials = 'default-credentials'
             elif active_user_account is not None:
-                self.credentials, self.project = get_credentials_for_account(
+                credentials, project = get_credentials_for_account(
                     active_user_account, self.scopes
                 )
-                self.active_credentials = active_user_account
+                active_credentials = active_user_account
             else:
-                self.credentials, self.project = None, None
-        Authenticator.__init__(self, parsed_attributes)
-        self.widgets = self.get_widgets(constants.WIDGET_WIDTH)
+                credentials, project = None, None
+        self._credentialed_accounts = credentialed_accounts
+        self._default_credentials_configured = default_credentials_configured
+        self._active_credentials = active_credentials
+        self._credentials, self._project = credentials, project
+        self._hash = None
+        self._initialized = True
+
+    @property
+    def credentialed_accounts(self):
+        self._ensure_initialized()
+        return self._credentialed_accounts
+
+    @credentialed_accounts.setter
+    def credentialed_accounts(self, value):
+        self._ensure_initialized()
+        self._credentialed_accounts = value
+
+    @property
+    def default_credentials_configured(self):
+        self._ensure_initialized()
+        return self._default_credentials_configured
+
+    @default_credentials_configured.setter
+    def default_credentials_configured(self, value):
+        self._ensure_initialized()
+        self._default_credentials_configured = value
+
+    @property
+    def active_credentials(self):
+        self._ensure_initialized()
+        return self._active_credentials
+
+    @active_credentials.setter
+    def active_credentials(self, value):
+        self._ensure_initialized()
+        self._active_credentials = value
+        self._hash = None
+
+    @property
+    def credentials(self):
+        self._ensure_initialized()
+        return self._credentials
+
+    @credentials.setter
+    def credentials(self, value):
+        self._ensure_initialized()
+        self._credentials = value
+
+    @property
+    def project(self):
+        self._ensure_initialized()
+        return self._project
+
+    @project.setter
+    def project(self, value):
+        self._ensure_initialized()
+        self._project = value
 
     def get_widgets(self, widget_width):
         """Creates and returns an address widget
@@ -295,6 +705,7 @@ class GoogleAuth(Authenticator):
         Returns:
             Sequence[hdijupyterutils.ipywidgetfactory.IpyWidgetFactory]: list of widgets
         """
+        self._ensure_initialized()
         self.project_widget = v.TextField(
             class_='ma-2',
             placeholder=constants.ENTER_PROJECT_MESSAGE,
@@ -397,6 +808,8 @@ class GoogleAuth(Authenticator):
         self.project_widget.on_event('change', self._update_project)
         self.region_widget.on_event('change', self._update_cluster_list_on_region)
         self.filter_widget.on_event('change', self._update_cluster_list_on_filter)
+        for widget in (self.project_widget, self.region_widget, self.cluster_widget):
+            widget.observe(self._schedule_component_gateway_url_prefetch, names='v_model')
         widgets = [self.account_widget, self.project_widget, self.region_widget,
                    self.cluster_widget, self.filter_widget]
         return widgets
@@ -411,12 +824,7 @@ class GoogleAuth(Authenticator):
                 self.project_widget.error = False
                 self.region_widget.error = False
                 self.project = self.project_widget.v_model
-                client = dataproc_v1beta2.ClusterControllerClient(
-                    credentials=self.credentials,
-                    client_options={
-                        "api_endpoint": f"{self.region_widget.v_model}-dataproc.googleapis.com:443"
-                    }
-                    )
+                client = _get_cluster_client(self.region_widget.v_model, self.credentials)
                 self.cluster_widget.items, self.filter_widget.items = get_cluster_pool(
                     self.project_widget.v_model, self.region_widget.v_model, client
                 )
@@ -453,12 +861,7 @@ class GoogleAuth(Authenticator):
                                                  self.credentials)
                 self.region_widget.error = False
                 self.project_widget.error = False
-                client = dataproc_v1beta2.ClusterControllerClient(
-                    credentials=self.credentials,
-                    client_options={
-                        "api_endpoint": f"{data}-dataproc.googleapis.com:443"
-                    }
-                    )
+                client = _get_cluster_client(data, self.credentials)
                 self.cluster_widget.items, self.filter_widget.items = get_cluster_pool(
                     self.project_widget.v_model, data, client
                 )
@@ -466,7 +869,7 @@ class GoogleAuth(Authenticator):
             except IndexError:
                 self.region_widget.error = False
                 pass
-            except:
+            except Exception:
                 self.region_widget.error = True
                 ipython_display.send_error("Please make sure you have entered a correct Project "\
                     "ID and Region.")
@@ -482,12 +885,7 @@ class GoogleAuth(Authenticator):
         #we need to update filters and clusters now
         if self.region_widget.v_model is not None:
             try:
-                client = dataproc_v1beta2.ClusterControllerClient(
-                    credentials=self.credentials,
-                    client_options={
-                        "api_endpoint": f"{self.region_widget.v_model}-dataproc.googleapis.com:443"
-                    }
-                    )
+                client = _get_cluster_client(self.region_widget.v_model, self.credentials)
                 #we update cluster dropdown
                 self.cluster_widget.items, _ = get_cluster_pool(
                     self.project_widget.v_model, self.region_widget.v_model, client, data
@@ -496,9 +894,10 @@ class GoogleAuth(Authenticator):
             except Exception as caught_exc:
                 self.cluster_widget.placeholder = constants.NO_CLUSTERS_FOUND_MESSAGE
                 self.filter_widget.placeholder = constants.NO_FILTERS_FOUND_MESSAGE
+                api_endpoint = constants.DATAPROC_API_ENDPOINT.format(
+                    region=self.region_widget.v_model)
                 ipython_display.send_error(f"Failed to create a client with the api_endpoint: "\
-                    f"{self.region_widget.v_model}-dataproc.googleapis.com:443 due to an error: "\
-                    f"{str(caught_exc)}")
+                    f"{api_endpoint} due to an error: {str(caught_exc)}")
 
     def _update_widgets_placeholder_text(self):
         """Helper method to update the cluster and filters placeholder text"""
@@ -511,11 +910,49 @@ class GoogleAuth(Authenticator):
         else:
             self.filter_widget.placeholder = constants.NO_FILTERS_FOUND_MESSAGE
 
+    def _component_gateway_url_key(self):
+        """Returns the get_component_gateway_url arguments for the current widget values"""
+        return (self.project_widget.v_model, self.region_widget.v_model,
+                self.cluster_widget.v_model, self.credentials)
+
+    def _schedule_component_gateway_url_prefetch(self, _change=None):
+        """Prefetches the component gateway url once the project, region, and cluster widgets
+        have not changed for ``constants.PREFETCH_DEBOUNCE_SECONDS``."""
+        with self._prefetch_lock:
+            if self._prefetch_timer is not None:
+                self._prefetch_timer.cancel()
+            self._prefetch_timer = threading.Timer(constants.PREFETCH_DEBOUNCE_SECONDS,
+                                                   self._prefetch_component_gateway_url)
+            self._prefetch_timer.daemon = True
+            self._prefetch_timer.start()
+
+    def _prefetch_component_gateway_url(self):
+        """Looks up the component gateway url for the current widget values in the background so
+        that update_with_widget_values does not have to wait for it."""
+        key = self._component_gateway_url_key()
+        project_id, region, cluster_name, credentials = key
+        # without a cluster the lookup would repeat the one the region and project change
+        # handlers just made
+        if not project_id or not region or not cluster_name or credentials is None:
+            return
+        future = Future()
+        with self._prefetch_lock:
+            if key in self._gateway_url_futures:
+                return
+            self._gateway_url_futures = {key: future}
+        # the lookup runs on the daemon timer thread rather than an executor, whose worker
+        # threads are joined at interpreter exit, so an unfinished lookup cannot delay shutdown
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(get_component_gateway_url(*key))
+        except Exception as caught_exc:
+            future.set_exception(caught_exc)
+
     def initialize_credentials_with_auth_account_selection(self, account):
         """Initializes self.credentials with the accound selected from the auth dropdown widget"""
         if account != self.active_credentials:
             if account == 'default-credentials':
-                self.credentials, self.project = google.auth.default(scopes=self.scopes)
+                self.credentials, self.project = _default_credentials(self.scopes)
             else:
                 self.credentials, self.project = get_credentials_for_account(account, self.scopes)
 
@@ -527,23 +964,58 @@ class GoogleAuth(Authenticator):
             "to authorize gcloud to access the Cloud Platform with Google user credentials to "\
             "authenticate. Run `gcloud auth application-default login` acquire new user "\
             "credentials to use for Application Default Credentials.")
+        self._ensure_initialized()
         if self.credentials is not None:
-            try:
-                self.initialize_credentials_with_auth_account_selection(self.account_widget.v_model)
-                self.url, self.cluster_widget.v_model = get_component_gateway_url(
-                    self.project_widget.v_model, self.region_widget.v_model,
-                    self.cluster_widget.v_model, self.credentials
-                )
-            except:
-                raise
+            self.initialize_credentials_with_auth_account_selection(self.account_widget.v_model)
+            key = self._component_gateway_url_key()
+            with self._prefetch_lock:
+                future = self._gateway_url_futures.get(key)
+            # a prefetch that failed is retried since its error may have been transient.
+            # future.exception() waits for a prefetch that is still running.
+            if future is None or future.cancelled() or future.exception() is not None:
+                url, cluster_name = get_component_gateway_url(*key)
+            else:
+                url, cluster_name = future.result()
+            resolved = Future()
+            resolved.set_result((url, cluster_name))
+            with self._prefetch_lock:
+                # setting the cluster widget below must not start another lookup for it
+                self._gateway_url_futures[key[:2] + (cluster_name, key[3])] = resolved
+            self.url, self.cluster_widget.v_model = url, cluster_name
+            self._hash = None
         else:
             raise no_credentials_exception
 
+    def _refresh_cached_token(self, credentials):
+        """Refreshes credentials if needed and caches the Authorization header for their token
+        along with the time.monotonic() value after which the token must be refreshed again."""
+        if not credentials.valid:
+            if self.callable_request is None:
+                import google.auth.transport.requests
+                self.callable_request = google.auth.transport.requests.Request()
+            credentials.refresh(self.callable_request)
+        if credentials.expiry is None:
+            expiry = float('inf')
+        else:
+            seconds_left = (credentials.expiry - datetime.datetime.utcnow()).total_seconds()
+            expiry = time.monotonic() + seconds_left - constants.TOKEN_EXPIRY_SKEW_SECONDS
+        self._auth_header = 'Bearer ' + credentials.token
+        self._cached_token_expiry = expiry
+        self._cached_token_credentials = credentials
+
     def __call__(self, request):
-        if not self.credentials.valid:
-            self.credentials.refresh(self.callable_request)
-        request.headers['Authorization'] = f'Bearer {self.credentials.token}'
+        credentials = self.credentials
+        if credentials is not self._cached_token_credentials or \
+        time.monotonic() >= self._cached_token_expiry:
+            # the lock keeps concurrent requests from all refreshing the same token
+            with self._token_lock:
+                if credentials is not self._cached_token_credentials or \
+                time.monotonic() >= self._cached_token_expiry:
+                    self._refresh_cached_token(credentials)
+        request.headers['Authorization'] = self._auth_header
         return request
 
     def __hash__(self):
-        return hash((self.active_credentials, self.url, self.__class__.__name__))
+        if self._hash is None:
+            self._hash = hash((self.active_credentials, self.url, self.__class__.__name__))
+        return self._hash
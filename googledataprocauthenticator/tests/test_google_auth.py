@@ -17,7 +17,10 @@
 
 
 import datetime
-from unittest.mock import call
+import os
+import tempfile
+import threading
+import time
 from mock import patch, Mock
 from nose.tools import raises, assert_equals, assert_is_not_none, assert_false, assert_true, assert_raises
 import requests
@@ -36,6 +39,17 @@ from sparkmagic.livyclientlib.linearretrypolicy import LinearRetryPolicy
 from sparkmagic.livyclientlib.reliablehttpclient import ReliableHttpClient
 
 
+def setup_module():
+    """Keeps the gcloud output written by these tests out of the user's real cache and lets them
+    run without gcloud installed"""
+    google_auth_class._gcloud_cache_path = os.path.join(tempfile.mkdtemp(), 'gcloud_cache.json')
+    with patch('shutil.which', return_value='gcloud'):
+        google_auth_class._get_gcloud_path()
+
+def setup_function():
+    google_auth_class._clear_gcloud_cache()
+    google_auth_class._clear_default_credentials_cache()
+
 def test_get_google():
     retry_policy = LinearRetryPolicy(0.01, 5)
     with patch('requests.Session.get') as patched_get:
@@ -67,7 +81,7 @@ def make_credentials():
     )
 
 creds = make_credentials()
-AUTH_LIST = '[{"account": "account@google.com","status": "ACTIVE"}]'
+AUTH_LIST = b'account@google.com\tACTIVE\n'
 mock_credentialed_accounts_no_accounts = (list(), None)
 mock_credentialed_accounts_valid_accounts = (['account@google.com'], 'account@google.com')
 
@@ -147,7 +161,7 @@ def test_initialize_credentials_with_auth_dropdown_default_credentials_to_defaul
         assert_equals(google_auth.active_credentials, 'default-credentials')
         google_auth.initialize_credentials_with_auth_account_selection(google_auth.active_credentials)
         assert_equals(google_auth.active_credentials, 'default-credentials')
-        d.assert_has_calls([call(scopes=google_auth.scopes), call(scopes=google_auth.scopes)])
+        d.assert_called_once_with(scopes=google_auth.scopes)
 
 def test_initialize_credentials_with_auth_dropdown_user_credentials_to_user_credentials():
     """If Google Authenticator is initialized with user credentials, if the account dropdown is not
@@ -267,3 +281,279 @@ def test_call_user_credentials_no_dropdown_change():
         google_auth.__call__(request)
         assert_true('Authorization' in request.headers)
         assert_equals(request.headers['Authorization'], 'Bearer {}'.format(google_auth.credentials.token))
+
+def test_run_gcloud_reuses_cached_output():
+    with patch('subprocess.check_output', return_value=AUTH_LIST) as check_output:
+        first = google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                              parse=google_auth_class._parse_account_list)
+        second = google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                               parse=google_auth_class._parse_account_list)
+        assert_equals(first, second)
+        check_output.assert_called_once()
+
+def test_run_gcloud_reuses_persisted_output_after_memory_cache_is_cleared():
+    with patch('subprocess.check_output', return_value=AUTH_LIST) as check_output:
+        google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                      parse=google_auth_class._parse_account_list)
+        google_auth_class._gcloud_output_cache.clear()
+        accounts = google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                                 parse=google_auth_class._parse_account_list)
+        assert_equals(accounts[0]['account'], 'account@google.com')
+        check_output.assert_called_once()
+
+def test_run_gcloud_keeps_persisted_output_in_memory():
+    with patch('subprocess.check_output', return_value=AUTH_LIST):
+        google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                      parse=google_auth_class._parse_account_list)
+    google_auth_class._gcloud_output_cache.clear()
+    with patch('googledataprocauthenticator.google._load_persisted_gcloud_output', \
+    wraps=google_auth_class._load_persisted_gcloud_output) as load_persisted:
+        for _ in range(2):
+            google_auth_class._run_gcloud(('gcloud', 'auth', 'list'), persist=True,
+                                          parse=google_auth_class._parse_account_list)
+        load_persisted.assert_called_once()
+
+def test_get_credentials_for_account_reuses_cached_credentials():
+    with patch('subprocess.check_output', return_value=AUTH_DESCRIBE_USER) as check_output:
+        first, _ = google_auth_class.get_credentials_for_account('account@google.com')
+        call_count = check_output.call_count
+        second, _ = google_auth_class.get_credentials_for_account('account@google.com')
+        assert_equals(first, second)
+        assert_equals(check_output.call_count, call_count)
+
+def test_list_credentialed_user_accounts_skips_accounts_without_access_token():
+    auth_list = b'first@google.com\t\nsecond@google.com\tACTIVE\nthird@google.com\t\n'
+    def check_output(command, **_kwargs):
+        return auth_list if 'list' in command else AUTH_DESCRIBE_USER
+    def get_auth_access_token(account):
+        if account == 'first@google.com':
+            raise google.auth.exceptions.UserAccessTokenError('error message')
+        return 'token'
+    with patch('subprocess.check_output', side_effect=check_output), \
+    patch('google.auth._cloud_sdk.get_auth_access_token', side_effect=get_auth_access_token):
+        accounts, active_account = google_auth_class.list_credentialed_user_accounts()
+        assert_equals(accounts, ['second@google.com', 'third@google.com'])
+        assert_equals(active_account, 'second@google.com')
+
+def test_get_credentials_for_account_reads_adc_file_without_gcloud():
+    config_path = tempfile.mkdtemp()
+    account_path = os.path.join(config_path, 'legacy_credentials', 'account@google.com')
+    os.makedirs(account_path)
+    with open(os.path.join(account_path, 'adc.json'), 'w') as adc_file:
+        adc_file.write('{"client_id": "client_id", "client_secret": "secret", "refresh_token": '\
+            '"refresh", "quota_project_id": "project", "type": "authorized_user"}')
+    with patch('google.auth._cloud_sdk.get_config_path', return_value=config_path), \
+    patch('subprocess.check_output') as check_output:
+        credentials, project = google_auth_class.get_credentials_for_account('account@google.com')
+        assert_equals(credentials.client_secret, 'secret')
+        assert_equals(project, 'project')
+        check_output.assert_not_called()
+
+def test_accounts_are_listed_when_widgets_are_first_accessed():
+    with patch('google.auth.default', side_effect=DefaultCredentialsError), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=mock_credentialed_accounts_no_accounts) as list_accounts:
+        google_auth = GoogleAuth()
+        list_accounts.assert_not_called()
+        assert_equals(google_auth.account_widget.items, [])
+        assert_equals(google_auth.widgets[0], google_auth.account_widget)
+        list_accounts.assert_called_once()
+
+def test_call_reuses_cached_token_until_it_expires():
+    def refresh(self, _request):
+        self.token = 'token'
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    with patch('google.auth.default', return_value=(not_refreshed_credentials(), 'project')), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=mock_credentialed_accounts_no_accounts), \
+    patch('google.oauth2.credentials.Credentials.refresh', side_effect=refresh, \
+    autospec=True) as refresh_credentials:
+        google_auth = GoogleAuth()
+        for _ in range(3):
+            request = google_auth(requests.Request(url="http://www.example.org"))
+            assert_equals(request.headers['Authorization'], 'Bearer token')
+        refresh_credentials.assert_called_once()
+
+def test_initializing_active_account_reuses_gcloud_output_from_listing_accounts():
+    def check_output(command, **_kwargs):
+        if 'list' in command:
+            return AUTH_LIST
+        if 'get-value' in command:
+            return '"project"'
+        return AUTH_DESCRIBE_USER
+    with patch('subprocess.check_output', side_effect=check_output) as patched_check_output, \
+    patch('google.auth.default', side_effect=DefaultCredentialsError), \
+    patch('google.auth._cloud_sdk.get_auth_access_token', return_value='token'):
+        google_auth = GoogleAuth()
+        assert_equals(google_auth.active_credentials, 'account@google.com')
+        assert_equals(google_auth.project, 'project')
+        # one call each for `auth list`, `auth describe` and `config get-value project`
+        assert_equals(patched_check_output.call_count, 3)
+
+def test_generate_component_gateway_url_keeps_only_scheme_and_netloc():
+    with patch('google.cloud.dataproc_v1beta2.ClusterControllerClient.get_cluster', return_value=make_cluster()):
+        url, cluster_name = google_auth_class.get_component_gateway_url("project", "region", "cluster", make_credentials())
+        assert_equals(url, "https://redacted-dot-us-central1.dataproc.googleusercontent.com/gateway/default/livy/v1")
+        assert_equals(cluster_name, "cluster")
+
+def test_cluster_client_is_reused_for_same_region_and_credentials():
+    credentials = make_credentials()
+    client = google_auth_class._get_cluster_client('us-central1', credentials)
+    assert_true(google_auth_class._get_cluster_client('us-central1', credentials) is client)
+    assert_false(google_auth_class._get_cluster_client('us-central1', make_credentials()) is client)
+    assert_false(google_auth_class._get_cluster_client('us-east1', credentials) is client)
+
+def test_generate_component_gateway_url_get_cluster_request_has_timeout():
+    with patch('google.cloud.dataproc_v1beta2.ClusterControllerClient.get_cluster', \
+    return_value=make_cluster()) as get_cluster:
+        google_auth_class.get_component_gateway_url("project", "region", "cluster", make_credentials())
+        _, kwargs = get_cluster.call_args
+        assert_equals(kwargs['timeout'], 10.0)
+        assert_equals(kwargs['retry'].deadline, 15.0)
+
+def test_run_gcloud_does_not_open_console_window():
+    with patch('subprocess.check_output', return_value=AUTH_DESCRIBE_USER) as check_output, \
+    patch('googledataprocauthenticator.google._GCLOUD_CREATIONFLAGS', 0x08000000):
+        google_auth_class._run_gcloud(('gcloud', 'auth', 'describe', 'account@google.com'))
+        _, kwargs = check_output.call_args
+        assert_equals(kwargs['creationflags'], 0x08000000)
+        assert_true(kwargs['close_fds'])
+
+def test_hash_changes_when_active_credentials_change():
+    with patch('google.auth.default', side_effect=DefaultCredentialsError), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=mock_credentialed_accounts_no_accounts):
+        google_auth = GoogleAuth()
+        first_hash = hash(google_auth)
+        assert_equals(hash(google_auth), first_hash)
+        google_auth.active_credentials = 'account@google.com'
+        assert_equals(hash(google_auth), hash(('account@google.com', google_auth.url, 'GoogleAuth')))
+
+def test_update_with_widget_values_uses_prefetched_component_gateway_url():
+    with patch('google.auth.default', return_value=(make_credentials(), 'project')), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=(list(), None)), \
+    patch('googledataprocauthenticator.google.get_component_gateway_url', \
+    return_value=('https://url/gateway/default/livy/v1', 'cluster')) as get_url:
+        google_auth = GoogleAuth()
+        google_auth.project_widget.v_model = 'project'
+        google_auth.region_widget.v_model = 'us-central1'
+        google_auth.cluster_widget.v_model = 'cluster'
+        google_auth._prefetch_timer.cancel()
+        google_auth._prefetch_component_gateway_url()
+        google_auth.update_with_widget_values()
+        assert_equals(google_auth.url, 'https://url/gateway/default/livy/v1')
+        get_url.assert_called_once_with('project', 'us-central1', 'cluster', google_auth.credentials)
+
+def test_component_gateway_url_is_not_prefetched_without_a_cluster():
+    with patch('google.auth.default', return_value=(make_credentials(), 'project')), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=(list(), None)), \
+    patch('googledataprocauthenticator.google.get_component_gateway_url') as get_url:
+        google_auth = GoogleAuth()
+        google_auth.project_widget.v_model = 'project'
+        google_auth.region_widget.v_model = 'us-central1'
+        google_auth._prefetch_timer.cancel()
+        google_auth._prefetch_component_gateway_url()
+        get_url.assert_not_called()
+
+def test_prefetch_that_fails_while_update_waits_for_it_is_retried():
+    started, release = threading.Event(), threading.Event()
+    def get_component_gateway_url(*_args):
+        if not started.is_set():
+            started.set()
+            release.wait()
+            raise GoogleAPICallError('transient')
+        return 'https://url/gateway/default/livy/v1', 'cluster'
+    with patch('google.auth.default', return_value=(make_credentials(), 'project')), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=(list(), None)), \
+    patch('googledataprocauthenticator.google.get_component_gateway_url', \
+    side_effect=get_component_gateway_url) as get_url:
+        google_auth = GoogleAuth()
+        google_auth.project_widget.v_model = 'project'
+        google_auth.region_widget.v_model = 'us-central1'
+        google_auth.cluster_widget.v_model = 'cluster'
+        google_auth._prefetch_timer.cancel()
+        prefetch = threading.Thread(target=google_auth._prefetch_component_gateway_url)
+        prefetch.start()
+        started.wait()
+        # the prefetch fails only after update_with_widget_values started waiting for it
+        threading.Timer(0.1, release.set).start()
+        google_auth.update_with_widget_values()
+        prefetch.join()
+        assert_equals(google_auth.url, 'https://url/gateway/default/livy/v1')
+        assert_equals(get_url.call_count, 2)
+
+def test_application_default_credentials_lookup_failure_is_cached():
+    with patch('google.auth.default', side_effect=DefaultCredentialsError) as default:
+        assert_false(google_auth_class.application_default_credentials_configured())
+        assert_false(google_auth_class.application_default_credentials_configured())
+        default.assert_called_once()
+
+@raises(BadUserConfigurationException)
+def test_gcloud_not_on_path_raises_bad_user_configuration_error():
+    with patch('googledataprocauthenticator.google._gcloud_path', None), \
+    patch('shutil.which', return_value=None):
+        google_auth_class.list_credentialed_user_accounts()
+
+def test_list_accounts_command_is_built_once():
+    assert_equals(google_auth_class._list_accounts_command(),
+                  ('gcloud',) + google_auth_class.constants.CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND)
+    assert google_auth_class._list_accounts_command() is \
+        google_auth_class._list_accounts_command()
+
+def test_access_token_probes_are_reused_across_instances():
+    auth_list = b'first@google.com\tACTIVE\nsecond@google.com\t\n'
+    def check_output(command, **_kwargs):
+        return auth_list if 'list' in command else AUTH_DESCRIBE_USER
+    with patch('subprocess.check_output', side_effect=check_output), \
+    patch('google.auth.default', side_effect=DefaultCredentialsError), \
+    patch('google.auth._cloud_sdk.get_auth_access_token', return_value='token') as get_token:
+        assert_equals(GoogleAuth().credentialed_accounts, ['first@google.com', 'second@google.com'])
+        assert_equals(GoogleAuth().credentialed_accounts, ['first@google.com', 'second@google.com'])
+        assert_equals(get_token.call_count, 2)
+
+def test_failure_to_load_credentials_does_not_hide_account_with_access_token():
+    credentials_results = [google_auth_class.UserAccessTokenError('transient'),
+                           (make_credentials(), 'project')]
+    with patch('subprocess.check_output', return_value=AUTH_LIST), \
+    patch('google.auth._cloud_sdk.get_auth_access_token', return_value='token'), \
+    patch('googledataprocauthenticator.google.get_credentials_for_account', \
+    side_effect=credentials_results):
+        assert_equals(google_auth_class.list_credentialed_user_accounts(), ([], None))
+        assert_equals(google_auth_class.list_credentialed_user_accounts(),
+                      (['account@google.com'], 'account@google.com'))
+
+def test_changing_credential_store_invalidates_cached_account_list():
+    config_path = tempfile.mkdtemp()
+    credentials_db = os.path.join(config_path, 'credentials.db')
+    open(credentials_db, 'w').close()
+    os.utime(credentials_db, (0, 0))
+    with patch('google.auth._cloud_sdk.get_config_path', return_value=config_path), \
+    patch('subprocess.check_output', return_value=AUTH_LIST) as check_output, \
+    patch('google.auth._cloud_sdk.get_auth_access_token', return_value='token') as get_token, \
+    patch('googledataprocauthenticator.google.get_credentials_for_account', \
+    return_value=(make_credentials(), 'project')):
+        google_auth_class.list_credentialed_user_accounts()
+        google_auth_class.list_credentialed_user_accounts()
+        assert_equals(check_output.call_count, 1)
+        assert_equals(get_token.call_count, 1)
+        # e.g. `gcloud auth login` was run
+        login_time = time.time() + 1
+        os.utime(credentials_db, (login_time, login_time))
+        google_auth_class.list_credentialed_user_accounts()
+        assert_equals(check_output.call_count, 2)
+        assert_equals(get_token.call_count, 2)
+
+def test_concurrent_first_access_lists_accounts_once():
+    with patch('google.auth.default', side_effect=DefaultCredentialsError), \
+    patch('googledataprocauthenticator.google.list_credentialed_user_accounts', \
+    return_value=(list(), None)) as list_accounts:
+        google_auth = GoogleAuth()
+        threads = [threading.Thread(target=lambda: google_auth.credentials) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        list_accounts.assert_called_once()
@@ -39,9 +39,27 @@ NO_FILTERS_FOUND_HELP_MESSAGE = f"{NO_FILTERS_FOUND_MESSAGE}. Please make sure y
 # The name of the Cloud SDK shell script
 CLOUD_SDK_POSIX_COMMAND = "gcloud"
 CLOUD_SDK_WINDOWS_COMMAND = "gcloud.cmd"
-# The command to get all credentialed accounts
-CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND = ("auth", "list", "--format", "json")
+# The command to get all credentialed accounts as tab separated account and status lines
+CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND = ("auth", "list", "--format",
+                                                "value(account,status)", "--quiet")
 # The command to get all credentialed accounts
 _CLOUD_SDK_CONFIG_COMMAND = ("config", "config-helper", "--format", "json")
 
-CLOUD_SDK_USER_CREDENTIALED_ACCOUNTS_COMMAND = ("auth", "list", "--format", "json")
+# The number of seconds cached gcloud output and account credentials are reused for, unless
+# gcloud's credential store changes first
+GCLOUD_CACHE_TTL_SECONDS = 300
+# The maximum number of credentialed accounts probed for access tokens at the same time
+MAX_ACCOUNT_PROBE_WORKERS = 8
+# The number of seconds before its expiry that a cached access token is refreshed
+TOKEN_EXPIRY_SKEW_SECONDS = 60
+# The number of seconds a single get_cluster request may take
+GET_CLUSTER_TIMEOUT_SECONDS = 10.0
+# The number of seconds get_cluster requests are retried for
+GET_CLUSTER_RETRY_DEADLINE_SECONDS = 15.0
+# The regional Dataproc API endpoint, formatted with a region
+DATAPROC_API_ENDPOINT = "{region}-dataproc.googleapis.com:443"
+# The number of seconds the project, region, and cluster widgets must be left unchanged before the
+# component gateway url is prefetched
+PREFETCH_DEBOUNCE_SECONDS = 0.3
+# The number of seconds the result of looking up application-default credentials is reused for
+DEFAULT_CREDENTIALS_CACHE_TTL_SECONDS = 60
@@ -29,7 +29,6 @@ setuptools.setup(
         'hdijupyterutils>=0.6',
         'google-cloud-dataproc',
         'google-auth',
-        'urllib3',
         'ipyvuetify'
     ]
 )